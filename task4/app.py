@@ -1,42 +1,251 @@
 
+import atexit
+import functools
+import io
+import json
 import sqlite3
-from contextlib import closing
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+import numpy as np
 import pandas as pd
 import streamlit as st
 
 st.set_page_config(page_title="Local Food Wastage Management", page_icon="🥗", layout="wide")
 
 # ---------- DB helpers ----------
+# Indexes on the join/filter columns used by the dashboard queries
+INDEXES_SQL = """
+CREATE INDEX IF NOT EXISTS idx_claims_receiver ON claims(receiver_id);
+CREATE INDEX IF NOT EXISTS idx_claims_food ON claims(food_id);
+CREATE INDEX IF NOT EXISTS idx_claims_status ON claims(status);
+CREATE INDEX IF NOT EXISTS idx_food_provider ON food_listings(provider_id);
+CREATE INDEX IF NOT EXISTS idx_food_expiry ON food_listings(date(expiry_date));
+CREATE INDEX IF NOT EXISTS idx_food_location ON food_listings(location);
+CREATE INDEX IF NOT EXISTS idx_food_type ON food_listings(food_type);
+CREATE INDEX IF NOT EXISTS idx_food_meal ON food_listings(meal_type);
+CREATE INDEX IF NOT EXISTS idx_food_month ON food_listings(expiry_month);
+CREATE INDEX IF NOT EXISTS idx_claims_month ON claims(claim_month);
+CREATE INDEX IF NOT EXISTS idx_providers_city ON providers(city);
+CREATE INDEX IF NOT EXISTS idx_receivers_city ON receivers(city);
+ANALYZE;
+"""
+
+# Summary tables kept current by triggers, so dashboard aggregates are a plain read.
+# NULL keys are skipped; the tables are rebuilt from the base tables on connect.
+AGG_SQL = """
+CREATE TABLE IF NOT EXISTS agg_providers_by_city (city TEXT PRIMARY KEY, cnt INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS agg_claims_by_status (status TEXT PRIMARY KEY, cnt INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS agg_donations_by_month (
+    month TEXT PRIMARY KEY, listings INTEGER NOT NULL, total_quantity INTEGER NOT NULL
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_agg_city_ins AFTER INSERT ON providers BEGIN
+    INSERT INTO agg_providers_by_city SELECT NEW.city, 1 WHERE NEW.city IS NOT NULL
+    ON CONFLICT(city) DO UPDATE SET cnt = cnt + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_agg_city_del AFTER DELETE ON providers BEGIN
+    UPDATE agg_providers_by_city SET cnt = cnt - 1 WHERE city = OLD.city;
+    DELETE FROM agg_providers_by_city WHERE city = OLD.city AND cnt <= 0;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_agg_city_upd AFTER UPDATE OF city ON providers BEGIN
+    UPDATE agg_providers_by_city SET cnt = cnt - 1 WHERE city = OLD.city;
+    DELETE FROM agg_providers_by_city WHERE city = OLD.city AND cnt <= 0;
+    INSERT INTO agg_providers_by_city SELECT NEW.city, 1 WHERE NEW.city IS NOT NULL
+    ON CONFLICT(city) DO UPDATE SET cnt = cnt + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_agg_status_ins AFTER INSERT ON claims BEGIN
+    INSERT INTO agg_claims_by_status SELECT NEW.status, 1 WHERE NEW.status IS NOT NULL
+    ON CONFLICT(status) DO UPDATE SET cnt = cnt + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_agg_status_del AFTER DELETE ON claims BEGIN
+    UPDATE agg_claims_by_status SET cnt = cnt - 1 WHERE status = OLD.status;
+    DELETE FROM agg_claims_by_status WHERE status = OLD.status AND cnt <= 0;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_agg_status_upd AFTER UPDATE OF status ON claims BEGIN
+    UPDATE agg_claims_by_status SET cnt = cnt - 1 WHERE status = OLD.status;
+    DELETE FROM agg_claims_by_status WHERE status = OLD.status AND cnt <= 0;
+    INSERT INTO agg_claims_by_status SELECT NEW.status, 1 WHERE NEW.status IS NOT NULL
+    ON CONFLICT(status) DO UPDATE SET cnt = cnt + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_agg_month_ins AFTER INSERT ON food_listings BEGIN
+    INSERT INTO agg_donations_by_month
+    SELECT NEW.expiry_month, 1, IFNULL(NEW.quantity, 0) WHERE NEW.expiry_month IS NOT NULL
+    ON CONFLICT(month) DO UPDATE SET listings = listings + 1,
+                                     total_quantity = total_quantity + excluded.total_quantity;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_agg_month_del AFTER DELETE ON food_listings BEGIN
+    UPDATE agg_donations_by_month
+    SET listings = listings - 1, total_quantity = total_quantity - IFNULL(OLD.quantity, 0)
+    WHERE month = OLD.expiry_month;
+    DELETE FROM agg_donations_by_month WHERE month = OLD.expiry_month AND listings <= 0;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_agg_month_upd AFTER UPDATE OF quantity, expiry_date ON food_listings BEGIN
+    UPDATE agg_donations_by_month
+    SET listings = listings - 1, total_quantity = total_quantity - IFNULL(OLD.quantity, 0)
+    WHERE month = OLD.expiry_month;
+    DELETE FROM agg_donations_by_month WHERE month = OLD.expiry_month AND listings <= 0;
+    INSERT INTO agg_donations_by_month
+    SELECT NEW.expiry_month, 1, IFNULL(NEW.quantity, 0) WHERE NEW.expiry_month IS NOT NULL
+    ON CONFLICT(month) DO UPDATE SET listings = listings + 1,
+                                     total_quantity = total_quantity + excluded.total_quantity;
+END;
+
+BEGIN;
+DELETE FROM agg_providers_by_city;
+INSERT INTO agg_providers_by_city
+SELECT city, COUNT(*) FROM providers WHERE city IS NOT NULL GROUP BY city;
+DELETE FROM agg_claims_by_status;
+INSERT INTO agg_claims_by_status
+SELECT status, COUNT(*) FROM claims WHERE status IS NOT NULL GROUP BY status;
+DELETE FROM agg_donations_by_month;
+INSERT INTO agg_donations_by_month
+SELECT expiry_month, COUNT(*), IFNULL(SUM(quantity), 0)
+FROM food_listings WHERE expiry_month IS NOT NULL GROUP BY expiry_month;
+COMMIT;
+"""
+
 @st.cache_resource
 def get_conn():
     import os
     DB_PATH = os.path.join(os.path.dirname(__file__), "food_waste.db")
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    # Room in the per-connection statement cache for every distinct query in the app
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, cached_statements=256)
     conn.execute("PRAGMA foreign_keys = ON;")
+    # Read-heavy tuning: WAL lets cached reads run alongside CRUD writes
+    conn.execute("PRAGMA journal_mode = WAL;")
+    conn.execute("PRAGMA synchronous = NORMAL;")
+    conn.execute("PRAGMA temp_store = MEMORY;")
+    conn.execute("PRAGMA mmap_size = 268435456;")
+    conn.execute("PRAGMA cache_size = -65536;")
+    conn.executescript(INDEXES_SQL)
+    conn.executescript(AGG_SQL)
+    conn.execute("PRAGMA optimize;")
+    atexit.register(conn.execute, "PRAGMA optimize;")
     return conn
 
+@st.cache_resource
+def get_db_lock():
+    # Sessions run on separate script threads but share one connection;
+    # reentrant so run_exec can be called inside transaction()
+    return threading.RLock()
+
+@st.cache_resource
+def get_tx_state():
+    # Set by transaction() while its BEGIN is open; per thread, and only read
+    # under db_lock, so run_exec can tell it is nested without trusting
+    # conn.in_transaction (a failed statement can leave sqlite3's implicit one open)
+    return threading.local()
+
 conn = get_conn()
+db_lock = get_db_lock()
+tx_state = get_tx_state()
 
 def run_query(query, params=()):
-    with closing(conn.cursor()) as cur:
-        cur.execute(query, params)
-        rows = cur.fetchall()
-        cols = [d[0] for d in cur.description] if cur.description else []
-    return pd.DataFrame(rows, columns=cols)
+    with db_lock:
+        return pd.read_sql_query(query, conn, params=params)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_query(query, params=()):
+    # Read-only queries; params must be a hashable tuple for the cache key
+    return run_query(query, tuple(params))
+
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_row(query, params=()):
+    # Single-row reads (KPIs/counts) skip the DataFrame entirely
+    with db_lock:
+        return conn.execute(query, tuple(params)).fetchone()
+
+@st.cache_data(ttl=300, show_spinner=False)
+def distinct_facets():
+    # Filter options change rarely; one scan fills all four Explore multiselects
+    return run_query("SELECT DISTINCT location, provider_type, food_type, meal_type FROM food_listings")
+
+def clear_read_caches(facets=True):
+    cached_query.clear()
+    cached_row.clear()
+    dashboard_figures.clear()
+    if facets:
+        distinct_facets.clear()
+
+@contextmanager
+def transaction():
+    # Group several writes under one COMMIT (one WAL sync) instead of one per run_exec
+    with db_lock:
+        conn.execute("BEGIN")
+        tx_state.active = True
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            tx_state.active = False
+            clear_read_caches()
 
 def run_exec(query, params=()):
-    with closing(conn.cursor()) as cur:
-        cur.execute(query, params)
-        conn.commit()
+    with db_lock:
+        nested = getattr(tx_state, "active", False)
+        if nested:
+            # transaction() commits (or rolls back) and clears caches for the group
+            conn.execute(query, params)
+            return
+        try:
+            conn.execute(query, params)
+            conn.commit()
+        except Exception:
+            # Don't leave sqlite3's implicit transaction (and the write lock) open
+            conn.rollback()
+            raise
+    clear_read_caches(facets="food_listings" in query)
 
 
 
 # ---------- UI helpers ----------
+@functools.cache
+def get_px():
+    # Plotly is only needed by the Dashboard; import it on first use
+    import plotly.express as px
+    return px
+
 def multiselect_or_all(label, options):
     sel = st.multiselect(label, options)
     return options if not sel else sel
 
+MAX_CHART_POINTS = 1000
+
+def downsample_lttb(df, y, n_out=MAX_CHART_POINTS):
+    # Largest-Triangle-Three-Buckets: keep the points that preserve the line's shape
+    n = len(df)
+    if n <= n_out or n_out < 3:
+        return df
+    ys = df[y].to_numpy(dtype=float)
+    buckets = np.array_split(np.arange(1, n - 1), n_out - 2)
+    keep = [0]
+    a = 0
+    for i, b in enumerate(buckets):
+        nxt = buckets[i + 1] if i + 1 < len(buckets) else np.array([n - 1])
+        avg_x, avg_y = nxt.mean(), ys[nxt].mean()
+        area = np.abs((a - avg_x) * (ys[b] - ys[a]) - (a - b) * (avg_y - ys[a]))
+        a = b[area.argmax()]
+        keep.append(a)
+    keep.append(n - 1)
+    return df.iloc[keep]
+
+def downsample_lttb_multi(df, ys, n_out=MAX_CHART_POINTS):
+    # One x axis, several lines: LTTB each series on an equal share of the budget
+    # and keep the union of their rows, so every series keeps its own shape
+    if len(df) <= n_out:
+        return df
+    per_series = max(3, n_out // len(ys))
+    keep = set()
+    for y in ys:
+        keep.update(downsample_lttb(df.reset_index(drop=True), y, per_series).index)
+    return df.iloc[sorted(keep)]
+
 
 st.title("Local Food Wastage Management System")
 st.caption("Filter, analyze and manage providers, receivers, listings and claims")
@@ -49,113 +258,116 @@ tab_overview, tab_dashboard, tab_explore, tab_queries, tab_crud, tab_insights, t
 
 
 # ---------- Overview ----------
-with tab_overview:
+@st.fragment
+def render_overview():
     c1, c2, c3, c4 = st.columns(4)
-    total_prov = run_query("SELECT COUNT(*) AS n FROM providers")
-    total_recv = run_query("SELECT COUNT(*) AS n FROM receivers")
-    total_food = run_query("SELECT COUNT(*) AS n FROM food_listings")
-    total_claims = run_query("SELECT COUNT(*) AS n FROM claims")
-    c1.metric("Providers", int(total_prov['n'].iloc[0]) if not total_prov.empty else 0)
-    c2.metric("Receivers", int(total_recv['n'].iloc[0]) if not total_recv.empty else 0)
-    c3.metric("Food Listings", int(total_food['n'].iloc[0]) if not total_food.empty else 0)
-    c4.metric("Claims", int(total_claims['n'].iloc[0]) if not total_claims.empty else 0)
+    n_prov, n_recv, n_food, n_claims = cached_row("""
+        SELECT (SELECT COUNT(*) FROM providers),
+               (SELECT COUNT(*) FROM receivers),
+               (SELECT COUNT(*) FROM food_listings),
+               (SELECT COUNT(*) FROM claims)
+    """)
+    c1.metric("Providers", n_prov)
+    c2.metric("Receivers", n_recv)
+    c3.metric("Food Listings", n_food)
+    c4.metric("Claims", n_claims)
 
     st.subheader("Recent Listings")
-    st.dataframe(run_query("SELECT food_id, food_name, quantity, expiry_date, location, food_type, meal_type FROM food_listings ORDER BY food_id DESC LIMIT 20"))
-    
-   # ---------- Dashboard ----------
-with tab_dashboard:
-    st.subheader("📊 Interactive Dashboard")
+    st.dataframe(cached_query("SELECT food_id, food_name, quantity, expiry_date, location, food_type, meal_type FROM food_listings ORDER BY food_id DESC LIMIT 20"))
+
+with tab_overview:
+    render_overview()
+
+
+# ---------- Dashboard ----------
+@st.cache_data(ttl=60, show_spinner=False)
+def dashboard_figures():
+    # Cache the built figures, not just the data: reruns skip Plotly construction.
+    # A None entry marks a chart whose data is empty.
+    px = get_px()
+    # One scan of food_listings feeds every listing-based chart below
+    fl = run_query("""
+        SELECT fl.food_name, fl.quantity, fl.food_type, p.name AS provider_name
+        FROM food_listings fl
+        LEFT JOIN providers p ON fl.provider_id = p.provider_id
+    """)
+    figs = {}
 
     # --- Providers per city ---
-    st.write("### Providers per City")
-    df_city = run_query("""
-        SELECT city, COUNT(*) AS provider_count
-        FROM providers
-        GROUP BY city
+    figs["Providers per City"] = None
+    df_city = cached_query("""
+        SELECT city, cnt AS provider_count
+        FROM agg_providers_by_city
         ORDER BY provider_count DESC;
     """)
     if not df_city.empty:
-        import plotly.express as px
         fig = px.bar(df_city, x="city", y="provider_count",
                      text="provider_count", title="Providers by City")
         fig.update_traces(textposition="outside", marker_color="#1F77B4")
-        st.plotly_chart(fig, use_container_width=True)
+        figs["Providers per City"] = fig
 
     # --- Food type distribution ---
-    st.write("### Food Type Distribution")
-    df_food_type = run_query("""
-        SELECT food_type, COUNT(*) AS cnt
-        FROM food_listings
-        GROUP BY food_type
-        ORDER BY cnt DESC;
-    """)
+    figs["Food Type Distribution"] = None
+    df_food_type = (fl.groupby("food_type").size()
+                    .reset_index(name="cnt")
+                    .sort_values("cnt", ascending=False))
     if not df_food_type.empty:
         fig = px.pie(df_food_type, names="food_type", values="cnt",
                      title="Food Types Share")
-        st.plotly_chart(fig, use_container_width=True)
+        figs["Food Type Distribution"] = fig
 
     # --- Claims status distribution ---
-    st.write("### Claims Status Distribution")
-    df_claims = run_query("""
-        SELECT LOWER(status) AS status, COUNT(*) AS cnt
-        FROM claims
-        GROUP BY LOWER(status);
+    figs["Claims Status Distribution"] = None
+    df_claims = cached_query("""
+        SELECT status, cnt
+        FROM agg_claims_by_status;
     """)
     if not df_claims.empty:
         fig = px.bar(df_claims, x="status", y="cnt",
                      text="cnt", title="Claims Status")
         fig.update_traces(marker_color="#2CA02C", textposition="outside")
-        st.plotly_chart(fig, use_container_width=True)
+        figs["Claims Status Distribution"] = fig
 
     # --- Top providers by total donations ---
-    st.write("### Top Providers by Total Donations")
-    df_top_providers = run_query("""
-        SELECT p.name, SUM(fl.quantity) AS total_donated
-        FROM food_listings fl
-        JOIN providers p ON fl.provider_id = p.provider_id
-        GROUP BY p.name
-        ORDER BY total_donated DESC
-        LIMIT 10;
-    """)
+    figs["Top Providers by Total Donations"] = None
+    df_top_providers = (fl.groupby("provider_name")["quantity"].sum()
+                        .nlargest(10)
+                        .rename_axis("name")
+                        .reset_index(name="total_donated"))
     if not df_top_providers.empty:
         fig = px.bar(df_top_providers, x="name", y="total_donated",
                      text="total_donated", title="Top 10 Providers")
         fig.update_traces(marker_color="#FF7F0E", textposition="outside")
-        st.plotly_chart(fig, use_container_width=True)
+        figs["Top Providers by Total Donations"] = fig
 
     # --- Donations trend over time ---
-    st.write("### Donations Trend Over Time")
-    df_trend = run_query("""
-        SELECT substr(expiry_date,1,7) AS month, SUM(quantity) AS total_quantity
-        FROM food_listings
-        GROUP BY substr(expiry_date,1,7)
+    figs["Donations Trend Over Time"] = None
+    df_trend = cached_query("""
+        SELECT month, total_quantity
+        FROM agg_donations_by_month
         ORDER BY month;
     """)
     if not df_trend.empty:
+        df_trend = downsample_lttb(df_trend, "total_quantity")
         fig = px.line(df_trend, x="month", y="total_quantity",
                       markers=True, title="Monthly Donations Trend")
         fig.update_traces(line_color="#9467BD")
-        st.plotly_chart(fig, use_container_width=True)
+        figs["Donations Trend Over Time"] = fig
 
     # --- Top food items ---
-    st.write("### Top 5 Donated Food Items")
-    df_food_items = run_query("""
-        SELECT food_name, SUM(quantity) AS total_quantity
-        FROM food_listings
-        GROUP BY food_name
-        ORDER BY total_quantity DESC
-        LIMIT 5;
-    """)
+    figs["Top 5 Donated Food Items"] = None
+    df_food_items = (fl.groupby("food_name")["quantity"].sum()
+                     .nlargest(5)
+                     .reset_index(name="total_quantity"))
     if not df_food_items.empty:
         fig = px.bar(df_food_items, x="food_name", y="total_quantity",
                      text="total_quantity", title="Top 5 Food Items")
         fig.update_traces(marker_color="#D62728", textposition="outside")
-        st.plotly_chart(fig, use_container_width=True)
+        figs["Top 5 Donated Food Items"] = fig
 
     # --- Top receivers by claims ---
-    st.write("### Top 5 Receivers by Claims")
-    df_top_receivers = run_query("""
+    figs["Top 5 Receivers by Claims"] = None
+    df_top_receivers = cached_query("""
         SELECT r.name, COUNT(c.claim_id) AS total_claims
         FROM claims c
         JOIN receivers r ON c.receiver_id = r.receiver_id
@@ -167,17 +379,31 @@ with tab_dashboard:
         fig = px.bar(df_top_receivers, x="name", y="total_claims",
                      text="total_claims", title="Top 5 Receivers")
         fig.update_traces(marker_color="#8C564B", textposition="outside")
-        st.plotly_chart(fig, use_container_width=True)
+        figs["Top 5 Receivers by Claims"] = fig
+
+    return figs
 
+@st.fragment
+def render_dashboard():
+    st.subheader("📊 Interactive Dashboard")
+    for heading, fig in dashboard_figures().items():
+        st.write(f"### {heading}")
+        if fig is not None:
+            st.plotly_chart(fig, use_container_width=True)
+
+with tab_dashboard:
+    render_dashboard()
 
 
 # ---------- Explore ----------
-with tab_explore:
+@st.fragment
+def render_explore():
     st.subheader("Filter Listings")
-    cities = run_query("SELECT DISTINCT location FROM food_listings")["location"].dropna().tolist()
-    provider_types = run_query("SELECT DISTINCT provider_type FROM food_listings")["provider_type"].dropna().tolist()
-    food_types = run_query("SELECT DISTINCT food_type FROM food_listings")["food_type"].dropna().tolist()
-    meal_types = run_query("SELECT DISTINCT meal_type FROM food_listings")["meal_type"].dropna().tolist()
+    facets = distinct_facets()
+    cities = facets["location"].dropna().unique().tolist()
+    provider_types = facets["provider_type"].dropna().unique().tolist()
+    food_types = facets["food_type"].dropna().unique().tolist()
+    meal_types = facets["meal_type"].dropna().unique().tolist()
 
     col1, col2, col3, col4 = st.columns(4)
     sel_cities = col1.multiselect("City", cities)
@@ -185,26 +411,38 @@ with tab_explore:
     sel_food_types = col3.multiselect("Food Type", food_types)
     sel_meal_types = col4.multiselect("Meal Type", meal_types)
 
-    query = "SELECT * FROM food_listings WHERE 1=1"
-    params = []
+    # Constant SQL text: each filter binds a JSON array (or NULL for "all")
+    where = """
+        WHERE (?1 IS NULL OR location IN (SELECT value FROM json_each(?1)))
+          AND (?2 IS NULL OR provider_type IN (SELECT value FROM json_each(?2)))
+          AND (?3 IS NULL OR food_type IN (SELECT value FROM json_each(?3)))
+          AND (?4 IS NULL OR meal_type IN (SELECT value FROM json_each(?4)))
+    """
+    filters = tuple(json.dumps(sel) if sel else None
+                    for sel in (sel_cities, sel_provider_types, sel_food_types, sel_meal_types))
+
+    (total,) = cached_row("SELECT COUNT(*) FROM food_listings" + where, filters)
+    pcol1, pcol2 = st.columns(2)
+    page_size = pcol1.selectbox("Rows per page", [50, 100, 250, 500], index=1)
+    n_pages = max(1, -(-total // page_size))
+    page = pcol2.number_input(f"Page (of {n_pages})", value=1, min_value=1, max_value=n_pages, step=1)
+
+    st.dataframe(cached_query("""
+        SELECT food_id, food_name, quantity, expiry_date, provider_id,
+               provider_type, location, food_type, meal_type
+        FROM food_listings""" + where + """
+        ORDER BY food_id
+        LIMIT ?5 OFFSET ?6
+    """, filters + (page_size, (int(page) - 1) * page_size)))
+    st.caption(f"{total} matching listings")
 
-    if sel_cities:
-        query += f" AND location IN ({','.join(['?']*len(sel_cities))})"
-        params += sel_cities
-    if sel_provider_types:
-        query += f" AND provider_type IN ({','.join(['?']*len(sel_provider_types))})"
-        params += sel_provider_types
-    if sel_food_types:
-        query += f" AND food_type IN ({','.join(['?']*len(sel_food_types))})"
-        params += sel_food_types
-    if sel_meal_types:
-        query += f" AND meal_type IN ({','.join(['?']*len(sel_meal_types))})"
-        params += sel_meal_types
+with tab_explore:
+    render_explore()
 
-    st.dataframe(run_query(query, tuple(params)))
 
 # ---------- Queries (Extended) ----------
-with tab_queries:
+@st.fragment
+def render_queries():
     st.subheader("Key Questions & Insights")
 
     queries = {
@@ -289,7 +527,7 @@ with tab_queries:
             SELECT r.name, COUNT(c.claim_id) AS completed_claims
             FROM claims c
             JOIN receivers r ON c.receiver_id = r.receiver_id
-            WHERE LOWER(c.status) = 'completed'
+            WHERE c.status = 'completed'
             GROUP BY r.name
             ORDER BY completed_claims DESC;
         """,
@@ -297,7 +535,7 @@ with tab_queries:
             SELECT fl.food_name, COUNT(c.claim_id) AS cancelled_claims
             FROM claims c
             JOIN food_listings fl ON c.food_id = fl.food_id
-            WHERE LOWER(c.status) = 'cancelled'
+            WHERE c.status = 'cancelled'
             GROUP BY fl.food_name
             ORDER BY cancelled_claims DESC;
         """,
@@ -313,14 +551,14 @@ with tab_queries:
             FROM claims c
             JOIN food_listings fl ON c.food_id = fl.food_id
             JOIN providers p ON fl.provider_id = p.provider_id
-            WHERE LOWER(c.status) = 'completed'
+            WHERE c.status = 'completed'
             GROUP BY p.name
             ORDER BY completed_claims DESC;
         """,
         "Claims status distribution": """
-            SELECT LOWER(status) AS status, COUNT(*) AS cnt
+            SELECT status, COUNT(*) AS cnt
             FROM claims
-            GROUP BY LOWER(status)
+            GROUP BY status
             ORDER BY cnt DESC;
         """,
         "Claim completion percentage": """
@@ -386,18 +624,22 @@ with tab_queries:
     if q_choice == "Provider contacts in selected city":
         city = st.text_input("City", value="")
         if city:
-            st.dataframe(run_query(queries[q_choice], (city,)))
+            st.dataframe(cached_query(queries[q_choice], (city,)))
     elif q_choice == "Listings nearing expiry (<= N days)":
         days = st.number_input("Days from now", value=3, min_value=0, step=1)
         offset = f"+{int(days)} day"
-        st.dataframe(run_query("SELECT * FROM food_listings WHERE date(expiry_date) <= date('now', ?)", (offset,)))
+        st.dataframe(cached_query("SELECT * FROM food_listings WHERE date(expiry_date) <= date('now', ?)", (offset,)))
     else:
         # Directly run the query without button
-        st.dataframe(run_query(queries[q_choice]))
+        st.dataframe(cached_query(queries[q_choice]))
+
+with tab_queries:
+    render_queries()
 
 
 # ---------- CRUD ----------
-with tab_crud:
+@st.fragment
+def render_crud():
     st.subheader("Manage Records")
 
     crud_tabs = st.tabs(["Providers", "Receivers", "Food Listings", "Claims"])
@@ -405,7 +647,7 @@ with tab_crud:
     # Providers
     with crud_tabs[0]:
         st.write("### Providers")
-        st.dataframe(run_query("SELECT * FROM providers ORDER BY provider_id"))
+        st.dataframe(cached_query("SELECT * FROM providers ORDER BY provider_id"))
         with st.form("add_provider"):
             st.write("**Add / Update Provider**")
             pid = st.number_input("Provider ID (blank for new)", value=0, min_value=0, step=1)
@@ -432,7 +674,7 @@ with tab_crud:
     # Receivers
     with crud_tabs[1]:
         st.write("### Receivers")
-        st.dataframe(run_query("SELECT * FROM receivers ORDER BY receiver_id"))
+        st.dataframe(cached_query("SELECT * FROM receivers ORDER BY receiver_id"))
         with st.form("add_receiver"):
             st.write("**Add / Update Receiver**")
             rid = st.number_input("Receiver ID (blank for new)", value=0, min_value=0, step=1)
@@ -458,7 +700,7 @@ with tab_crud:
     # Food Listings
     with crud_tabs[2]:
         st.write("### Food Listings")
-        st.dataframe(run_query("SELECT * FROM food_listings ORDER BY food_id DESC LIMIT 200"))
+        st.dataframe(cached_query("SELECT * FROM food_listings ORDER BY food_id DESC LIMIT 200"))
         with st.form("add_food"):
             st.write("**Add / Update Food**")
             fid = st.number_input("Food ID (blank for new)", value=0, min_value=0, step=1)
@@ -493,7 +735,7 @@ with tab_crud:
     # Claims
     with crud_tabs[3]:
         st.write("### Claims")
-        st.dataframe(run_query("SELECT * FROM claims ORDER BY claim_id DESC LIMIT 200"))
+        st.dataframe(cached_query("SELECT * FROM claims ORDER BY claim_id DESC LIMIT 200"))
         with st.form("add_claim"):
             st.write("**Add / Update Claim**")
             cid = st.number_input("Claim ID (blank for new)", value=0, min_value=0, step=1)
@@ -505,25 +747,30 @@ with tab_crud:
             if submitted:
                 if cid and cid > 0:
                     run_exec("UPDATE claims SET food_id=?, receiver_id=?, status=?, timestamp=? WHERE claim_id=?",
-                             (fid, rid, status, ts, cid))
+                             (fid, rid, status.lower(), ts, cid))
                     st.success("Claim updated")
                 else:
                     run_exec("INSERT INTO claims(food_id, receiver_id, status, timestamp) VALUES(?,?,?,?)",
-                             (fid, rid, status, ts))
+                             (fid, rid, status.lower(), ts))
                     st.success("Claim added")
         del_id = st.number_input("Delete Claim ID", value=0, min_value=0, step=1, key="del_c")
         if st.button("Delete Claim"):
             run_exec("DELETE FROM claims WHERE claim_id=?", (int(del_id),))
             st.warning("Claim deleted (if existed)")
-            
+
+with tab_crud:
+    render_crud()
+
+
 # ---------- Alerts ----------
 
 
-with tab_alerts:
+@st.fragment
+def render_alerts():
     st.subheader("🚨 Alerts & Notifications")
 
     # 1. Expiring food in next 3 days
-    expiring_food = run_query("""
+    expiring_food = cached_query("""
         SELECT food_name, quantity, expiry_date, location 
         FROM food_listings 
         WHERE date(expiry_date) <= date('now', '+3 day')
@@ -536,7 +783,7 @@ with tab_alerts:
         st.success("✅ No food is nearing expiry in the next 3 days.")
 
     # 2. Low stock (quantity <= 5)
-    low_stock = run_query("""
+    low_stock = cached_query("""
         SELECT food_name, quantity, location, expiry_date
         FROM food_listings
         WHERE quantity <= 5
@@ -549,12 +796,12 @@ with tab_alerts:
         st.info("✅ No low stock alerts.")
 
     # 3. Pending claims
-    pending_claims = run_query("""
+    pending_claims = cached_query("""
         SELECT c.claim_id, r.name AS receiver, f.food_name, c.status, c.timestamp
         FROM claims c
         JOIN receivers r ON c.receiver_id = r.receiver_id
         JOIN food_listings f ON c.food_id = f.food_id
-        WHERE LOWER(c.status) = 'pending'
+        WHERE c.status = 'pending'
         ORDER BY c.timestamp ASC
     """)
     if not pending_claims.empty:
@@ -563,57 +810,70 @@ with tab_alerts:
     else:
         st.success("✅ No pending claims.")
 
+with tab_alerts:
+    render_alerts()
+
 
 # ---------- Insights ----------
-with tab_insights:
+@st.fragment
+def render_insights():
     st.subheader("🧠 Smart Insights Dashboard")
 
     # KPI Cards
     c1, c2, c3 = st.columns(3)
-    top_city = run_query("SELECT location, COUNT(*) AS listings FROM food_listings GROUP BY location ORDER BY listings DESC LIMIT 1")
-    top_food = run_query("SELECT food_type, COUNT(*) AS cnt FROM food_listings GROUP BY food_type ORDER BY cnt DESC LIMIT 1")
-    top_receiver = run_query("""
-        SELECT r.name, COUNT(c.claim_id) AS claims 
-        FROM claims c 
-        JOIN receivers r ON c.receiver_id = r.receiver_id
-        GROUP BY r.name ORDER BY claims DESC LIMIT 1
+    (city, city_listings,
+     food_type, food_cnt,
+     receiver, receiver_claims) = cached_row("""
+        WITH top_city AS (
+            SELECT location, COUNT(*) AS listings FROM food_listings
+            GROUP BY location ORDER BY listings DESC LIMIT 1
+        ), top_food AS (
+            SELECT food_type, COUNT(*) AS cnt FROM food_listings
+            GROUP BY food_type ORDER BY cnt DESC LIMIT 1
+        ), top_receiver AS (
+            SELECT r.name, COUNT(c.claim_id) AS claims
+            FROM claims c
+            JOIN receivers r ON c.receiver_id = r.receiver_id
+            GROUP BY r.name ORDER BY claims DESC LIMIT 1
+        )
+        SELECT COALESCE(top_city.location, 'N/A'), COALESCE(top_city.listings, 0),
+               COALESCE(top_food.food_type, 'N/A'), COALESCE(top_food.cnt, 0),
+               COALESCE(top_receiver.name, 'N/A'), COALESCE(top_receiver.claims, 0)
+        FROM (SELECT 1)
+        LEFT JOIN top_city ON 1
+        LEFT JOIN top_food ON 1
+        LEFT JOIN top_receiver ON 1
     """)
 
-    c1.metric("🏙️ Top City (Listings)", 
-              top_city['location'].iloc[0] if not top_city.empty else "N/A", 
-              int(top_city['listings'].iloc[0]) if not top_city.empty else 0)
-
-    c2.metric("🍱 Most Common Food", 
-              top_food['food_type'].iloc[0] if not top_food.empty else "N/A", 
-              int(top_food['cnt'].iloc[0]) if not top_food.empty else 0)
-
-    c3.metric("🤝 Top Receiver (Claims)", 
-              top_receiver['name'].iloc[0] if not top_receiver.empty else "N/A", 
-              int(top_receiver['claims'].iloc[0]) if not top_receiver.empty else 0)
+    c1.metric("🏙️ Top City (Listings)", city, city_listings)
+    c2.metric("🍱 Most Common Food", food_type, food_cnt)
+    c3.metric("🤝 Top Receiver (Claims)", receiver, receiver_claims)
 
     st.markdown("---")
 
     # Charts side by side
     col1, col2 = st.columns(2)
 
-with col1:
-    st.write("### 📊 Claims Status Trend")
-    df_claims_trend = run_query("""
-        SELECT SUBSTR(timestamp, 1, 7) AS month, status, COUNT(*) AS cnt
-        FROM claims
-        GROUP BY month, status
-        ORDER BY month;
-    """)
-    if not df_claims_trend.empty:
-        pivot = df_claims_trend.pivot(index="month", columns="status", values="cnt").fillna(0)
-        st.line_chart(pivot)
-    else:
-        st.info("No claims data available to display trend.")
-
+    with col1:
+        st.write("### 📊 Claims Status Trend")
+        df_claims_trend = cached_query("""
+            SELECT claim_month AS month,
+                   SUM(CASE WHEN status = 'pending' THEN 1 ELSE 0 END) AS pending,
+                   SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) AS completed,
+                   SUM(CASE WHEN status = 'cancelled' THEN 1 ELSE 0 END) AS cancelled
+            FROM claims
+            GROUP BY claim_month
+            ORDER BY month;
+        """)
+        if not df_claims_trend.empty:
+            df_claims_trend = downsample_lttb_multi(df_claims_trend, ["pending", "completed", "cancelled"])
+            st.line_chart(df_claims_trend.set_index("month"))
+        else:
+            st.info("No claims data available to display trend.")
 
     with col2:
         st.write("### 🍽️ Meal Type Popularity")
-        df_meals = run_query("SELECT meal_type, COUNT(*) AS cnt FROM food_listings GROUP BY meal_type")
+        df_meals = cached_query("SELECT meal_type, COUNT(*) AS cnt FROM food_listings GROUP BY meal_type")
         if not df_meals.empty:
             st.bar_chart(df_meals.set_index("meal_type"))
 
@@ -621,7 +881,7 @@ with col1:
 
     # Deep dive analysis
     st.write("### 🔍 Expiry Risk Analysis")
-    expiry = run_query("""
+    expiry = cached_query("""
         SELECT location, COUNT(*) AS near_expiry 
         FROM food_listings
         WHERE date(expiry_date) <= date('now', '+5 day')
@@ -632,8 +892,13 @@ with col1:
     else:
         st.info("No items are nearing expiry in the next 5 days ✅")
 
+with tab_insights:
+    render_insights()
+
+
 # ---------- Reports ----------
-with tab_reports:
+@st.fragment
+def render_reports():
     st.subheader("📑 Reports & Data Export")
 
     report_choice = st.selectbox("Choose a report to export", [
@@ -645,36 +910,42 @@ with tab_reports:
     ])
 
     if report_choice == "Providers List":
-        df = run_query("SELECT * FROM providers ORDER BY provider_id")
+        df = cached_query("SELECT * FROM providers ORDER BY provider_id")
     elif report_choice == "Receivers List":
-        df = run_query("SELECT * FROM receivers ORDER BY receiver_id")
+        df = cached_query("SELECT * FROM receivers ORDER BY receiver_id")
     elif report_choice == "Food Listings":
-        df = run_query("SELECT * FROM food_listings ORDER BY expiry_date")
+        df = cached_query("SELECT * FROM food_listings ORDER BY expiry_date")
     elif report_choice == "Claims":
-        df = run_query("SELECT * FROM claims ORDER BY timestamp DESC")
+        df = cached_query("SELECT * FROM claims ORDER BY timestamp DESC")
     elif report_choice == "Expiring Soon Food":
-        df = run_query("SELECT * FROM food_listings WHERE date(expiry_date) <= date('now', '+3 day') ORDER BY expiry_date")
+        df = cached_query("SELECT * FROM food_listings WHERE date(expiry_date) <= date('now', '+3 day') ORDER BY expiry_date")
 
     if not df.empty:
         st.dataframe(df)
 
-        # Download as CSV
-        csv = df.to_csv(index=False).encode("utf-8")
+        # Download as gzipped CSV, written straight into one bytes buffer
+        buf = io.BytesIO()
+        df.to_csv(buf, index=False, encoding="utf-8", compression="gzip")
         st.download_button(
             "Download CSV",
-            csv,
-            f"{report_choice.replace(' ','_').lower()}.csv",
-            "text/csv",
+            buf.getvalue(),
+            f"{report_choice.replace(' ','_').lower()}.csv.gz",
+            "application/gzip",
             key="download-csv"
         )
 
+with tab_reports:
+    render_reports()
+
+
 # ---------- Geo Map ----------
-with tab_map:
+@st.fragment
+def render_map():
     st.subheader("🌍 Geographic View of Food Network")
 
     # Separate providers and receivers
-    df_providers = run_query("SELECT name, city FROM providers")
-    df_receivers = run_query("SELECT name, city FROM receivers")
+    df_providers = cached_query("SELECT name, city FROM providers")
+    df_receivers = cached_query("SELECT name, city FROM receivers")
 
     col1, col2 = st.columns(2)
 
@@ -692,3 +963,5 @@ with tab_map:
         else:
             st.info("No receivers found")
 
+with tab_map:
+    render_map()
@@ -1,176 +1,329 @@
 
+import argparse
+import csv
+import functools
+import gzip
+import os
 import sqlite3
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
 
+# Optional: pyarrow parses CSVs with multithreaded C++ (GIL released); without it
+# the csv module is used
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    from pyarrow import csv as pa_csv
+except ImportError:
+    pa = None
+
 # === CONFIG ===
 DB_PATH = "food_waste.db"
 
-# Correct paths (no extra space after 'dataset\')
-PROVIDERS_CSV = r"C:\Users\B santosh\Downloads\labmantexi\task4\task4\dataset\providers_data.csv"
-RECEIVERS_CSV = r"C:\Users\B santosh\Downloads\labmantexi\task4\task4\dataset\receivers_data.csv"
-FOOD_LISTINGS_CSV = r"C:\Users\B santosh\Downloads\labmantexi\task4\task4\dataset\food_listings_data.csv"
-CLAIMS_CSV = r"C:\Users\B santosh\Downloads\labmantexi\task4\task4\dataset\claims_data.csv"
+# CSV sources: the dataset/ folder next to this script unless overridden by an
+# environment variable or command-line flag. Gzipped files (.csv.gz) are read directly.
+DATASET_DIR = Path(__file__).resolve().parent / "dataset"
+PROVIDERS_CSV = os.environ.get("PROVIDERS_CSV", str(DATASET_DIR / "providers_data.csv"))
+RECEIVERS_CSV = os.environ.get("RECEIVERS_CSV", str(DATASET_DIR / "receivers_data.csv"))
+FOOD_LISTINGS_CSV = os.environ.get("FOOD_LISTINGS_CSV", str(DATASET_DIR / "food_listings_data.csv"))
+CLAIMS_CSV = os.environ.get("CLAIMS_CSV", str(DATASET_DIR / "claims_data.csv"))
+
+# Target columns per table, primary key first; CSV headers are matched after normalization
+PROVIDERS_COLUMNS = ["provider_id", "name", "type", "address", "city", "contact"]
+RECEIVERS_COLUMNS = ["receiver_id", "name", "type", "city", "contact"]
+FOOD_LISTINGS_COLUMNS = ["food_id", "food_name", "quantity", "expiry_date", "provider_id",
+                         "provider_type", "location", "food_type", "meal_type"]
+CLAIMS_COLUMNS = ["claim_id", "food_id", "receiver_id", "status", "timestamp"]
+
+# Drop and recreate the tables on every load, leaving the write transaction open.
+# Recreating means an older file picks up the current schema (generated month
+# columns, CHECK/NOT NULL constraints); dropping also removes every index and
+# trigger on the tables, the app's included, so neither the load nor a DELETE
+# maintains them row by row. main rebuilds the load indexes in a single pass
+# afterwards; the app recreates its own indexes and triggers and rebuilds the
+# summary tables when it connects (INDEXES_SQL / AGG_SQL in app.py).
+# The summary tables are dropped too: their triggers are gone and their counts
+# describe the old data, so an app still running on them errors out instead of
+# showing stale totals. Children before parents to keep the foreign keys satisfied.
+CLEAR_SQL = """
+BEGIN IMMEDIATE;
+DROP TABLE IF EXISTS agg_providers_by_city;
+DROP TABLE IF EXISTS agg_claims_by_status;
+DROP TABLE IF EXISTS agg_donations_by_month;
+DROP TABLE IF EXISTS claims;
+DROP TABLE IF EXISTS food_listings;
+DROP TABLE IF EXISTS receivers;
+DROP TABLE IF EXISTS providers;
+"""
+
+PAGE_SIZE = 8192
+
+# Lowest compile-time default of SQLITE_MAX_VARIABLE_NUMBER across SQLite builds
+SQLITE_MAX_VARIABLES = 999
 
 
 def create_conn(db_path=DB_PATH):
     conn = sqlite3.connect(db_path)
     conn.execute("PRAGMA foreign_keys = ON;")
+    # Larger pages: shallower b-trees for the wide listing rows. Only applies to a
+    # new (empty) file, so it must run before WAL mode writes the header;
+    # main converts an existing file with VACUUM.
+    conn.execute(f"PRAGMA page_size = {PAGE_SIZE};")
+    # Bulk-load tuning
+    conn.execute("PRAGMA journal_mode = WAL;")
+    conn.execute("PRAGMA synchronous = NORMAL;")
+    conn.execute("PRAGMA temp_store = MEMORY;")
+    conn.execute("PRAGMA cache_size = -200000;")
     return conn
 
-def create_tables(conn):
-    cur = conn.cursor()
-
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS providers (
-        provider_id INTEGER PRIMARY KEY,
-        name TEXT,
-        type TEXT,
-        address TEXT,
-        city TEXT,
-        contact TEXT
-    );
-    """)
-
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS receivers (
-        receiver_id INTEGER PRIMARY KEY,
-        name TEXT,
-        type TEXT,
-        city TEXT,
-        contact TEXT
-    );
-    """)
-
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS food_listings (
-        food_id INTEGER PRIMARY KEY,
-        food_name TEXT,
-        quantity INTEGER,
-        expiry_date TEXT,
-        provider_id INTEGER,
-        provider_type TEXT,
-        location TEXT,
-        food_type TEXT,
-        meal_type TEXT,
-        FOREIGN KEY(provider_id) REFERENCES providers(provider_id) ON DELETE SET NULL
-    );
-    """)
-
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS claims (
-        claim_id INTEGER PRIMARY KEY,
-        food_id INTEGER,
-        receiver_id INTEGER,
-        status TEXT,
-        timestamp TEXT,
-        FOREIGN KEY(food_id) REFERENCES food_listings(food_id) ON DELETE CASCADE,
-        FOREIGN KEY(receiver_id) REFERENCES receivers(receiver_id) ON DELETE SET NULL
-    );
-    """)
-
-    conn.commit()
-
-def load_csv_safe(path):
-    if not Path(path).exists():
-        print(f"WARNING: CSV not found: {path}")
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS providers (
+    provider_id INTEGER PRIMARY KEY,
+    name TEXT,
+    type TEXT,
+    address TEXT,
+    city TEXT,
+    contact TEXT
+);
+
+CREATE TABLE IF NOT EXISTS receivers (
+    receiver_id INTEGER PRIMARY KEY,
+    name TEXT,
+    type TEXT,
+    city TEXT,
+    contact TEXT
+);
+
+CREATE TABLE IF NOT EXISTS food_listings (
+    food_id INTEGER PRIMARY KEY,
+    food_name TEXT,
+    quantity INTEGER,
+    expiry_date TEXT,
+    provider_id INTEGER,
+    provider_type TEXT,
+    location TEXT,
+    food_type TEXT,
+    meal_type TEXT,
+    expiry_month TEXT GENERATED ALWAYS AS (substr(expiry_date, 1, 7)) STORED,
+    FOREIGN KEY(provider_id) REFERENCES providers(provider_id) ON DELETE SET NULL
+);
+
+CREATE TABLE IF NOT EXISTS claims (
+    claim_id INTEGER PRIMARY KEY,
+    food_id INTEGER NOT NULL,
+    receiver_id INTEGER,
+    status TEXT CHECK (status IN ('pending', 'completed', 'cancelled')),
+    timestamp TEXT,
+    claim_month TEXT GENERATED ALWAYS AS (substr(timestamp, 1, 7)) STORED,
+    FOREIGN KEY(food_id) REFERENCES food_listings(food_id) ON DELETE CASCADE,
+    FOREIGN KEY(receiver_id) REFERENCES receivers(receiver_id) ON DELETE SET NULL
+);
+"""
+
+SPACE_TO_UNDERSCORE = str.maketrans({" ": "_"})
+
+def normalize_column(name):
+    # Unify column names (strip/underscore/lower)
+    return name.strip().casefold().translate(SPACE_TO_UNDERSCORE)
+
+def as_int(value):
+    return int(value) if value else None
+
+def as_text(value):
+    return value or None
+
+def as_status(value):
+    # Store status lowercased so queries can filter on the plain column
+    return value.lower() or None
+
+# Source date layouts seen in the CSVs (US month-first), tried in order
+DATE_FORMATS = ["%Y-%m-%d", "%m/%d/%Y", "%m-%d-%Y"]
+TIMESTAMP_FORMATS = ["%Y-%m-%d %H:%M:%S", "%m/%d/%Y %H:%M", "%m-%d-%Y %H:%M"] + DATE_FORMATS
+ISO_DATE = "%Y-%m-%d"
+ISO_TIMESTAMP = "%Y-%m-%d %H:%M:%S"
+
+def parse_datetime(value, formats):
+    for fmt in formats:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    return None
+
+# Cached: a column holds few distinct dates, and a miss costs several failed strptime calls
+@functools.lru_cache(maxsize=None)
+def as_iso_date(value):
+    # ISO-8601 text so SQLite's date()/substr() and plain string ordering work;
+    # unrecognized values are kept as-is rather than dropped
+    if not value:
         return None
+    parsed = parse_datetime(value, DATE_FORMATS)
+    return parsed.strftime(ISO_DATE) if parsed else value
+
+@functools.lru_cache(maxsize=None)
+def as_iso_timestamp(value):
+    if not value:
+        return None
+    parsed = parse_datetime(value, TIMESTAMP_FORMATS)
+    return parsed.strftime(ISO_TIMESTAMP) if parsed else value
+
+# Per-column converters applied while building rows; everything else is text
+CONVERTERS = {
+    "provider_id": as_int,
+    "receiver_id": as_int,
+    "food_id": as_int,
+    "claim_id": as_int,
+    "quantity": as_int,
+    "status": as_status,
+    "expiry_date": as_iso_date,
+    "timestamp": as_iso_timestamp,
+}
+
+def bulk_insert(conn, table, cols, rows, batch=500):
+    # One multi-row INSERT per batch instead of one statement step per row,
+    # staying under SQLite's bound-parameter limit
+    per_stmt = max(1, min(batch, SQLITE_MAX_VARIABLES // len(cols)))
+    head = f"INSERT INTO {table}({','.join(cols)}) VALUES "
+    row_sql = "(" + ",".join(["?"] * len(cols)) + ")"
+    full_sql = head + ",".join([row_sql] * per_stmt)
+    values = []
+    n = 0
+    for n, row in enumerate(rows, 1):
+        values.extend(row)
+        if len(values) == per_stmt * len(cols):
+            conn.execute(full_sql, values)
+            values = []
+    if values:
+        conn.execute(head + ",".join([row_sql] * (len(values) // len(cols))), values)
+    return n
+
+def open_csv(path):
+    # Compressed CSVs mean fewer bytes off disk; decompression is cheap by comparison
+    if str(path).endswith(".gz"):
+        return gzip.open(path, "rt", newline="", encoding="utf-8-sig")
+    return open(path, newline="", encoding="utf-8-sig")
+
+def convert_column_arrow(col, conv):
+    # Run a (memoized) Python converter once per distinct value and map the
+    # results back by dictionary index, so both parse paths share one parser
+    encoded = col.dictionary_encode()
+    mapped = pa.array([conv(v) for v in encoded.dictionary.to_pylist()], pa.string())
+    return mapped.take(encoded.indices).to_pylist()
+
+def read_rows_arrow(path, header, cols):
+    # Same conversions as CONVERTERS, done column-wise by Arrow: only "" is NULL
+    # (as with the csv module), ints typed up front, status lowercased
+    types = {c: pa.int64() if CONVERTERS.get(c) is as_int else pa.string() for c in cols}
+    reader = pa_csv.open_csv(
+        path,
+        read_options=pa_csv.ReadOptions(column_names=header, skip_rows=1),
+        # Quoted addresses span lines; without this, block splits land mid-record
+        parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+        convert_options=pa_csv.ConvertOptions(
+            column_types=types,
+            include_columns=cols,
+            null_values=[""],
+            strings_can_be_null=True,
+        ),
+    )
+    # Convert batch by batch instead of assembling a Table first. Memory is not
+    # bounded: every row is still collected as a Python tuple (larger than the
+    # Arrow data) because read_rows sorts by primary key and the insert runs
+    # later on the main thread
+    rows = []
+    for batch in reader:
+        columns = []
+        for c in cols:
+            conv = CONVERTERS.get(c)
+            if conv is as_status:
+                columns.append(pc.utf8_lower(batch.column(c)).to_pylist())
+            elif conv in (as_iso_date, as_iso_timestamp):
+                columns.append(convert_column_arrow(batch.column(c), conv))
+            else:
+                columns.append(batch.column(c).to_pylist())
+        rows.extend(zip(*columns))
+    return rows
+
+def primary_key_order(row):
+    # Blank keys go last: SQLite assigns them rowids after the current maximum
+    return (row[0] is None, row[0] or 0)
+
+def read_rows(path, cols):
+    # Parse a CSV into converted rows for cols: no DataFrame, no dtype inference.
+    # Touches no connection, so it can run on a worker thread.
     try:
-        df = pd.read_csv(path)
-        return df
+        with open_csv(path) as f:
+            reader = csv.reader(f)
+            header = [normalize_column(h) for h in next(reader)]
+            if pa is not None:
+                rows = read_rows_arrow(path, header, cols)
+            else:
+                plan = [(header.index(c), CONVERTERS.get(c, as_text)) for c in cols]
+                rows = [[conv(row[i]) for i, conv in plan] for row in reader if row]
+            # Ascending INTEGER PRIMARY KEY (first column) appends to the rowid b-tree
+            # instead of splitting pages
+            rows.sort(key=primary_key_order)
+    except FileNotFoundError:
+        print(f"WARNING: CSV not found: {path}")
+        return []
     except Exception as e:
         print(f"ERROR reading {path}: {e}")
-        return None
+        return []
+    return rows
 
-def normalize_columns(df):
-    if df is None:
-        return None
-    # Unify column names (strip/underscore/lower)
-    df.columns = [str(c).strip().lower().replace(" ", "_") for c in df.columns]
-    return df
-
-def insert_df(conn, table, df):
-    if df is None or df.empty:
-        print(f"Skipping insert for {table}: empty or None")
-        return
-    df.to_sql(table, conn, if_exists="append", index=False)
-
-def main():
-    conn = create_conn()
-    create_tables(conn)
-
-    # Load and normalize
-    providers = normalize_columns(load_csv_safe(PROVIDERS_CSV))
-    receivers = normalize_columns(load_csv_safe(RECEIVERS_CSV))
-    food = normalize_columns(load_csv_safe(FOOD_LISTINGS_CSV))
-    claims = normalize_columns(load_csv_safe(CLAIMS_CSV))
-
-    # Optionally map columns to expected names if needed
-    # Providers
-    if providers is not None:
-        providers = providers.rename(columns={
-            "provider_id":"provider_id",
-            "name":"name",
-            "type":"type",
-            "address":"address",
-            "city":"city",
-            "contact":"contact",
-        })
-        providers = providers[["provider_id","name","type","address","city","contact"]]
-
-    # Receivers
-    if receivers is not None:
-        receivers = receivers.rename(columns={
-            "receiver_id":"receiver_id",
-            "name":"name",
-            "type":"type",
-            "city":"city",
-            "contact":"contact",
-        })
-        receivers = receivers[["receiver_id","name","type","city","contact"]]
-
-    # Food listings
-    if food is not None:
-        food = food.rename(columns={
-            "food_id":"food_id",
-            "food_name":"food_name",
-            "quantity":"quantity",
-            "expiry_date":"expiry_date",
-            "provider_id":"provider_id",
-            "provider_type":"provider_type",
-            "location":"location",
-            "food_type":"food_type",
-            "meal_type":"meal_type",
-        })
-        food = food[["food_id","food_name","quantity","expiry_date","provider_id","provider_type","location","food_type","meal_type"]]
-
-    # Claims
-    if claims is not None:
-        claims = claims.rename(columns={
-            "claim_id":"claim_id",
-            "food_id":"food_id",
-            "receiver_id":"receiver_id",
-            "status":"status",
-            "timestamp":"timestamp",
-        })
-        claims = claims[["claim_id","food_id","receiver_id","status","timestamp"]]
-
-    # Clear existing data to avoid duplicates
-    cur = conn.cursor()
-    for t in ["claims", "food_listings", "receivers", "providers"]:
-        cur.execute(f"DELETE FROM {t};")
-    conn.commit()
-
-    insert_df(conn, "providers", providers)
-    insert_df(conn, "receivers", receivers)
-    insert_df(conn, "food_listings", food)
-    insert_df(conn, "claims", claims)
-
-    # Simple indexes
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_food_provider ON food_listings(provider_id);")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_claims_food ON claims(food_id);")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_claims_receiver ON claims(receiver_id);")
-    conn.commit()
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build food_waste.db from the CSV dataset.")
+    parser.add_argument("--providers", default=PROVIDERS_CSV, help="providers CSV (.csv or .csv.gz)")
+    parser.add_argument("--receivers", default=RECEIVERS_CSV, help="receivers CSV (.csv or .csv.gz)")
+    parser.add_argument("--food-listings", default=FOOD_LISTINGS_CSV, help="food listings CSV (.csv or .csv.gz)")
+    parser.add_argument("--claims", default=CLAIMS_CSV, help="claims CSV (.csv or .csv.gz)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    sources = [
+        ("providers", args.providers, PROVIDERS_COLUMNS),
+        ("receivers", args.receivers, RECEIVERS_COLUMNS),
+        ("food_listings", args.food_listings, FOOD_LISTINGS_COLUMNS),
+        ("claims", args.claims, CLAIMS_COLUMNS),
+    ]
+    # The files are independent: read them concurrently (overlapping disk I/O with
+    # connection setup) and leave the write lock untaken until every parse is done;
+    # all database work stays on this thread's connection
+    with ThreadPoolExecutor(max_workers=len(sources)) as ex:
+        parsed = [ex.submit(read_rows, path, cols) for _, path, cols in sources]
+
+        conn = create_conn()
+
+    # Recreate, reload and index in one transaction (committed on leaving the block)
+    with conn:
+        # executescript commits anything pending first, so it also opens the
+        # transaction; the schema is one script, a single parse
+        conn.executescript(CLEAR_SQL + SCHEMA_SQL)
+
+        # sources lists parents before children
+        for (table, _, cols), future in zip(sources, parsed):
+            if not bulk_insert(conn, table, cols, future.result()):
+                print(f"Skipping insert for {table}: empty")
+
+        # Simple indexes
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_food_provider ON food_listings(provider_id);")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_claims_food ON claims(food_id);")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_claims_receiver ON claims(receiver_id);")
+        # Ordering indexes for the report/alert listings (PK DESC already walks the rowid b-tree)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_food_expiry_date ON food_listings(expiry_date);")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_food_quantity ON food_listings(quantity);")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_claims_timestamp ON claims(timestamp);")
+
+    # A file created before the page size was set keeps its old pages; VACUUM
+    # rewrites it, but only outside WAL mode
+    if conn.execute("PRAGMA page_size;").fetchone()[0] != PAGE_SIZE:
+        conn.execute("PRAGMA journal_mode = DELETE;")
+        conn.execute(f"PRAGMA page_size = {PAGE_SIZE};")
+        conn.execute("VACUUM;")
+        conn.execute("PRAGMA journal_mode = WAL;")
+    conn.close()
 
     print("Database created and populated at", DB_PATH)
 
@@ -54,14 +54,14 @@ SELECT p.name, COUNT(c.claim_id) AS completed_claims
 FROM claims c
 JOIN food_listings fl ON c.food_id = fl.food_id
 JOIN providers p ON fl.provider_id = p.provider_id
-WHERE LOWER(c.status) = 'completed'
+WHERE c.status = 'completed'
 GROUP BY p.name
 ORDER BY completed_claims DESC;
 
 -- 11. Claims status distribution
-SELECT LOWER(status) AS status, COUNT(*) AS cnt
+SELECT status, COUNT(*) AS cnt
 FROM claims
-GROUP BY LOWER(status)
+GROUP BY status
 ORDER BY cnt DESC;
 
 -- 12. Average quantity claimed per receiver (approximation: avg of quantities of foods they claimed)
@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+
+import init_db
+
+CLAIMS_CSV = """Claim_ID,Food_ID,Receiver_ID,Status,Timestamp
+1,10,20,Pending,3/21/2025 0:59
+2,11,21,Completed,03-05-2025
+3,12,22,Cancelled,2025-02-30
+4,13,23,pending,3/17/25
+5,14,24,pending, 3/17/2025
+6,15,25,pending,
+"""
+
+FOOD_LISTINGS_CSV = """Food_ID,Food_Name,Quantity,Expiry_Date,Provider_ID,Provider_Type,Location,Food_Type,Meal_Type
+1,Bread,5,3/17/2025,1,Restaurant,Here,Vegan,Lunch
+2,Soup,6,2025-02-30,1,Restaurant,Here,Vegan,Lunch
+3,Rice,7,3/17/25,1,Restaurant,Here,Vegan,Lunch
+4,Milk,8, 3/17/2025,1,Restaurant,Here,Vegan,Lunch
+5,Eggs,9,,1,Restaurant,Here,Vegan,Lunch
+"""
+
+
+class ParsePathParityTest(unittest.TestCase):
+    # The csv-module and pyarrow paths must store the same values, including
+    # for dates that don't match any known layout
+
+    def write(self, text):
+        fd, path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(fd, "w", newline="") as f:
+            f.write(text)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def read_both(self, path, cols):
+        arrow = init_db.pa
+        try:
+            init_db.pa = None
+            plain = [list(r) for r in init_db.read_rows(path, cols)]
+        finally:
+            init_db.pa = arrow
+        if arrow is None:
+            self.skipTest("pyarrow not installed")
+        return plain, [list(r) for r in init_db.read_rows(path, cols)]
+
+    def test_claim_timestamps(self):
+        plain, arrow = self.read_both(self.write(CLAIMS_CSV), init_db.CLAIMS_COLUMNS)
+        self.assertEqual(plain, arrow)
+        self.assertEqual([r[4] for r in plain], [
+            "2025-03-21 00:59:00", "2025-03-05 00:00:00", "2025-02-30",
+            "3/17/25", " 3/17/2025", None,
+        ])
+
+    def test_blank_primary_key(self):
+        text = CLAIMS_CSV.replace("\n2,11,", "\n,11,")
+        plain, arrow = self.read_both(self.write(text), init_db.CLAIMS_COLUMNS)
+        self.assertEqual(plain, arrow)
+        self.assertEqual([r[0] for r in plain], [1, 3, 4, 5, 6, None])
+
+    def test_expiry_dates(self):
+        plain, arrow = self.read_both(self.write(FOOD_LISTINGS_CSV), init_db.FOOD_LISTINGS_COLUMNS)
+        self.assertEqual(plain, arrow)
+        self.assertEqual([r[3] for r in plain], ["2025-03-17", "2025-02-30", "3/17/25", " 3/17/2025", None])
+
+
+if __name__ == "__main__":
+    unittest.main()